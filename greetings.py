@@ -0,0 +1,116 @@
+import os
+import wave
+import asyncio
+import hashlib
+import logging
+
+import aiohttp
+from livekit import rtc
+from livekit.plugins import cartesia
+
+logger = logging.getLogger("quickcall-greetings")
+
+OUTBOUND_GREETING = "Hello! This is your AI assistant calling. I can hear you now. How can I help you today?"
+INBOUND_GREETING = "Hello, thank you for calling. How can I assist you today?"
+
+# Cartesia voice settings for all agent speech. The greeting cache is keyed on these,
+# so the live TTS must be built with the same values for cached greetings to match.
+CARTESIA_MODEL = "sonic-2"
+CARTESIA_VOICE = "794f9389-aac1-45b6-b726-9d9369183238"
+CARTESIA_SAMPLE_RATE = 24000
+
+# Synthesized greetings are stored as WAV files keyed by text and voice
+GREETING_CACHE_DIR = os.path.join(os.path.dirname(__file__), 'cache', 'greetings')
+
+# Length of each frame replayed from a cached greeting
+FRAME_DURATION_MS = 20
+
+# Greeting audio frames loaded in this process, keyed by greeting text
+_greeting_audio = {}
+
+def _cartesia_api_key():
+    return os.environ.get('CARTESIA_API_KEY') or os.environ.get('REACT_APP_CARTESIA_API_KEY')
+
+def _cache_path(text):
+    """Return the cache file for a greeting synthesized with the configured voice"""
+    key = f"{CARTESIA_MODEL}:{CARTESIA_VOICE}:{CARTESIA_SAMPLE_RATE}:{text}"
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return os.path.join(GREETING_CACHE_DIR, f"{digest}.wav")
+
+async def _synthesize_missing(api_key):
+    """Synthesize greetings that aren't cached on disk yet"""
+    async with aiohttp.ClientSession() as http_session:
+        tts_opts = dict(
+            model=CARTESIA_MODEL,
+            voice=CARTESIA_VOICE,
+            sample_rate=CARTESIA_SAMPLE_RATE,
+            http_session=http_session,
+        )
+        tts = cartesia.TTS(api_key=api_key, **tts_opts) if api_key else cartesia.TTS(**tts_opts)
+        for text in (OUTBOUND_GREETING, INBOUND_GREETING):
+            path = _cache_path(text)
+            if os.path.exists(path):
+                continue
+            async with tts.synthesize(text) as stream:
+                frames = [audio.frame async for audio in stream]
+            if not frames:
+                continue
+            # Write to a temporary file first so workers never load a partial greeting
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with wave.open(tmp_path, 'wb') as wav:
+                wav.setnchannels(frames[0].num_channels)
+                wav.setsampwidth(2)
+                wav.setframerate(frames[0].sample_rate)
+                for frame in frames:
+                    wav.writeframes(bytes(frame.data))
+            os.replace(tmp_path, path)
+            logger.info("Cached greeting audio at %s: %s", path, text)
+
+def synthesize_greetings():
+    """Synthesize any uncached greetings once, in the worker's main process"""
+    os.makedirs(GREETING_CACHE_DIR, exist_ok=True)
+    try:
+        asyncio.run(_synthesize_missing(_cartesia_api_key()))
+    except Exception as e:
+        logger.warning("Failed to pre-synthesize greetings, falling back to live TTS: %s", e)
+
+def _load_frames(path):
+    """Read a cached greeting WAV file into audio frames"""
+    with wave.open(path, 'rb') as wav:
+        sample_rate = wav.getframerate()
+        num_channels = wav.getnchannels()
+        samples_per_frame = sample_rate * FRAME_DURATION_MS // 1000
+        frames = []
+        while True:
+            data = wav.readframes(samples_per_frame)
+            if not data:
+                break
+            frames.append(rtc.AudioFrame(
+                data=data,
+                sample_rate=sample_rate,
+                num_channels=num_channels,
+                samples_per_channel=len(data) // (2 * num_channels),
+            ))
+    return frames
+
+def prewarm_greetings(proc):
+    """Worker prewarm hook: load the cached greetings from disk, without any network I/O"""
+    for text in (OUTBOUND_GREETING, INBOUND_GREETING):
+        path = _cache_path(text)
+        try:
+            _greeting_audio[text] = _load_frames(path)
+        except FileNotFoundError:
+            logger.info("No cached audio for greeting, will use live TTS: %s", text)
+        except Exception as e:
+            logger.warning("Failed to load cached greeting %s: %s", path, e)
+
+async def _replay(frames):
+    for frame in frames:
+        yield frame
+
+def say_greeting(session, text):
+    """Speak a greeting, using cached audio when available"""
+    frames = _greeting_audio.get(text)
+    if frames:
+        return session.say(text, audio=_replay(frames))
+    return session.say(text)
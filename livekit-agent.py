@@ -1,49 +1,238 @@
 import os
-import json
 import logging
 import sys
 import asyncio
+import atexit
+import queue
+import re
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 
+import aiohttp
+import orjson
 from dotenv import load_dotenv
 from letta_client import Letta
 
 from livekit import agents, api, rtc
-from livekit.agents import AgentSession, Agent, AutoSubscribe, get_job_context, ChatMessage
+from livekit.agents import AgentSession, Agent, AutoSubscribe, get_job_context, ChatMessage, utils
+from livekit.agents import stt as agents_stt, tts as agents_tts
 from livekit.plugins import (
     openai,
     cartesia,
     deepgram,
 )
+
+from greetings import (
+    CARTESIA_MODEL,
+    CARTESIA_SAMPLE_RATE,
+    CARTESIA_VOICE,
+    INBOUND_GREETING,
+    OUTBOUND_GREETING,
+    prewarm_greetings,
+    say_greeting,
+    synthesize_greetings,
+)
+
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
+# Use libuv's event loop if available. This runs at import time so LiveKit's job
+# processes, which import this script as __mp_main__, get it too.
+if uvloop is not None:
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
 load_dotenv()
 
-# Create logs directory if it doesn't exist
-logs_dir = os.path.join(os.path.dirname(__file__), 'logs')
-os.makedirs(logs_dir, exist_ok=True)
+logger = logging.getLogger("telephony-agent")
+
+# Banner separators for the job and startup log sections
+_SEP60 = "=" * 60
+_SEP80 = "=" * 80
+
+# LiveKit's debug stream logs per-frame RTP/RTCP traffic, so only enable it with
+# QUICKCALL_DEBUG=1
+livekit_log_level = logging.DEBUG if os.environ.get('QUICKCALL_DEBUG') else logging.WARNING
+logging.getLogger("livekit").setLevel(livekit_log_level)
+logging.getLogger("livekit.agents").setLevel(livekit_log_level)
+
+# Log handlers are set up lazily by configure_logging() rather than at import time,
+# so spawned job processes don't touch the log directory until they run a job
+log_filename = None
+_logging_configured = False
+
+def configure_logging():
+    """Set up console and file logging for this process, once"""
+    global log_filename, _logging_configured
+    if _logging_configured:
+        return
+    _logging_configured = True
+    
+    # Create logs directory if it doesn't exist
+    logs_dir = os.path.join(os.path.dirname(__file__), 'logs')
+    os.makedirs(logs_dir, exist_ok=True)
+    
+    # Create a unique log file for this process
+    log_filename = os.path.join(
+        logs_dir, f'livekit-agent-{datetime.now().strftime("%Y%m%d-%H%M%S")}-{os.getpid()}.log'
+    )
+    
+    # Set QUICKCALL_DEBUG=1 to enable debug logging
+    log_level = logging.DEBUG if os.environ.get('QUICKCALL_DEBUG') else logging.INFO
+    
+    # Configure logging with both file and console handlers. Records are queued on the
+    # event loop thread and written to the console/file by a background listener thread.
+    log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(log_formatter)
+    file_handler = logging.FileHandler(log_filename, mode='a')
+    file_handler.setFormatter(log_formatter)
+    
+    log_queue = queue.Queue(-1)
+    log_listener = QueueListener(log_queue, console_handler, file_handler)
+    log_listener.start()
+    atexit.register(log_listener.stop)
+    
+    root_logger = logging.getLogger()
+    root_logger.setLevel(log_level)
+    root_logger.addHandler(QueueHandler(log_queue))
+    
+    # Log startup information
+    logger.info("Logging to file: %s", log_filename)
+    logger.info("Process PID: %s", os.getpid())
+    logger.info("Working directory: %s", os.getcwd())
+
+def prewarm_connections(*plugins):
+    """Start the plugins' service connections in the background, if they support it"""
+    for plugin in plugins:
+        # The base STT/TTS classes define prewarm() as a no-op, so only call it when
+        # the plugin overrides it
+        base = next((b for b in (agents_stt.STT, agents_tts.TTS) if isinstance(plugin, b)), None)
+        if base is None or type(plugin).prewarm is base.prewarm:
+            logger.debug("%s has no prewarm hook, skipping", type(plugin).__module__)
+            continue
+        try:
+            plugin.prewarm()
+            logger.info("Prewarming %s connection", type(plugin).__module__)
+        except Exception as e:
+            logger.warning("Failed to prewarm %s: %s", type(plugin).__module__, e)
+
+# Fallback system prompt for the plain OpenAI path. Kept constant so the prompt prefix
+# is byte-identical across calls and can hit the provider's prefix cache. The Letta
+# path sends no instructions; the persistent prompt lives in the Letta agent config.
+FALLBACK_SYSTEM_PROMPT = "You are a helpful AI assistant. Be concise and friendly."
+
+async def probe_letta(letta_base_url, agent_id):
+    """Check that the Letta agent is reachable without blocking the event loop"""
+    logger.info("Testing Letta connection to %s...", letta_base_url)
+    try:
+        # Same per-job session the Deepgram/Cartesia plugins use; LiveKit closes it
+        async with utils.http_context.http_session().get(
+            f"{letta_base_url}/v1/agents/{agent_id}",
+            timeout=aiohttp.ClientTimeout(total=5),
+        ) as response:
+            status = response.status
+        logger.info("Letta agent test response: %s", status)
+        if status == 200:
+            logger.info("✅ Letta agent is accessible")
+        else:
+            logger.warning("⚠️ Letta agent returned status %s", status)
+    except Exception as e:
+        logger.error("❌ Cannot reach Letta: %s", e)
 
-# Create a unique log file for this run
-log_filename = os.path.join(logs_dir, f'livekit-agent-{datetime.now().strftime("%Y%m%d-%H%M%S")}.log')
+def build_stt_tts():
+    """Build the Deepgram STT and Cartesia TTS plugins from the environment"""
+    deepgram_key = os.environ.get('DEEPGRAM_API_KEY') or os.environ.get('REACT_APP_DEEPGRAM_API_KEY')
+    cartesia_key = os.environ.get('CARTESIA_API_KEY') or os.environ.get('REACT_APP_CARTESIA_API_KEY')
+    stt = deepgram.STT(api_key=deepgram_key) if deepgram_key else deepgram.STT()
+    # Same voice settings the cached greetings were synthesized with
+    tts_opts = dict(model=CARTESIA_MODEL, voice=CARTESIA_VOICE, sample_rate=CARTESIA_SAMPLE_RATE)
+    tts = cartesia.TTS(api_key=cartesia_key, **tts_opts) if cartesia_key else cartesia.TTS(**tts_opts)
+    return stt, tts
+
+def prewarm(proc):
+    """Worker prewarm hook: prepare STT/TTS and greetings while the job process is still idle"""
+    try:
+        proc.userdata["stt"], proc.userdata["tts"] = build_stt_tts()
+    except Exception as e:
+        logger.warning("Failed to prebuild STT/TTS, building them per job: %s", e)
+    prewarm_greetings(proc)
 
-# Configure logging with both file and console handlers
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.StreamHandler(sys.stderr),
-        logging.FileHandler(log_filename, mode='a')
-    ]
+# Only these environment variables are logged, and only at DEBUG level
+LOGGED_ENV_KEYS = (
+    'LETTA_AGENT_ID',
+    'LIVEKIT_URL',
+    'LIVEKIT_API_KEY',
+    'LIVEKIT_SIP_TRUNK_ID',
+    'LETTA_API_KEY',
+    'OPENAI_API_KEY',
+    'DEEPGRAM_API_KEY',
+    'CARTESIA_API_KEY',
 )
-logger = logging.getLogger("telephony-agent")
 
-# Also enable debug logging for LiveKit
-logging.getLogger("livekit").setLevel(logging.DEBUG)
-logging.getLogger("livekit.agents").setLevel(logging.DEBUG)
+# Environment variable names whose values are masked when logged
+_SENSITIVE_RE = re.compile(r'KEY|SECRET|PASSWORD|TOKEN')
+
+def log_environment():
+    """Log the environment variables relevant to our setup, masking secrets"""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    logger.debug("Environment variables:")
+    for key in LOGGED_ENV_KEYS:
+        value = os.environ.get(key)
+        if value and _SENSITIVE_RE.search(key.upper()):
+            logger.debug("  %s: %s%s", key, '*' * 8, value[-4:])
+        else:
+            logger.debug("  %s: %s", key, value)
+
+def load_metadata(metadata, source):
+    """Parse job/room metadata into a dict, returning {} if it is empty or invalid"""
+    if not metadata:
+        return {}
+    if isinstance(metadata, dict):
+        return metadata
+    try:
+        data = orjson.loads(metadata)
+    except orjson.JSONDecodeError as e:
+        logger.warning("Failed to parse %s metadata: %s", source, e)
+        return {}
+    if not isinstance(data, dict):
+        logger.warning("Ignoring %s metadata that is not a JSON object", source)
+        return {}
+    return data
+
+# Strong references to fire-and-forget tasks so they aren't garbage collected
+_background_tasks = set()
+
+async def greet(session, phone_number):
+    """Greet the caller and wait for the greeting to finish playing"""
+    # For inbound calls, greet the caller
+    # For outbound calls, greet the user when they answer
+    if phone_number:
+        greeting = OUTBOUND_GREETING
+        logger.info("Sending outbound greeting to %s: %s", phone_number, greeting)
+    else:
+        greeting = INBOUND_GREETING
+        logger.info("Sending inbound greeting: %s", greeting)
+    await say_greeting(session, greeting)
+    logger.info("Greeting played successfully")
+
+def on_greet_done(task):
+    """Log the outcome of a background greeting task"""
+    _background_tasks.discard(task)
+    if task.cancelled():
+        logger.warning("Greeting was cancelled")
+    elif task.exception() is not None:
+        logger.error("Failed to send greeting: %s", task.exception())
 
-# Log startup information
-logger.info(f"Logging to file: {log_filename}")
-logger.info(f"Process PID: {os.getpid()}")
-logger.info(f"Working directory: {os.getcwd()}")
+def on_probe_done(task):
+    """Log the outcome of a background Letta probe task"""
+    _background_tasks.discard(task)
+    if task.cancelled():
+        logger.warning("Letta probe was cancelled")
+    elif task.exception() is not None:
+        logger.error("Letta probe failed: %s", task.exception())
 
 async def hangup_call():
     """End the call by deleting the room"""
@@ -58,231 +247,241 @@ async def hangup_call():
     )
 
 async def entrypoint(ctx: agents.JobContext):
-    logger.info("=" * 60)
-    logger.info(f"AGENT STARTING at {datetime.now().isoformat()}")
-    logger.info("=" * 60)
+    configure_logging()
+    logger.info(_SEP60)
+    logger.info("AGENT STARTING at %s", datetime.now().isoformat())
+    logger.info(_SEP60)
     
     # Log all environment variables related to our setup
-    logger.info("Environment variables:")
-    for key in ['LETTA_AGENT_ID', 'LIVEKIT_URL', 'LIVEKIT_API_KEY', 'DEEPGRAM_API_KEY', 'CARTESIA_API_KEY']:
-        value = os.environ.get(key)
-        if key.endswith('KEY') and value:
-            logger.info(f"  {key}: {'*' * 8}{value[-4:]}")
-        else:
-            logger.info(f"  {key}: {value}")
+    log_environment()
     
-    # Get agent ID from environment variable first (set by server)
-    agent_id = os.environ.get('LETTA_AGENT_ID')
+    agent_id = None
     phone_number = None
     
-    logger.info(f"Initial agent_id from env: {agent_id}")
-    logger.info(f"Job metadata: {ctx.job.metadata}")
-    logger.info(f"Room metadata: {ctx.room.metadata}")
+    logger.info("Job metadata: %s", ctx.job.metadata)
+    logger.info("Room metadata: %s", ctx.room.metadata)
     
-    # If not in env, try job metadata
-    if not agent_id and ctx.job.metadata:
-        try:
-            job_data = json.loads(ctx.job.metadata)
-            agent_id = job_data.get("agent_id")
-            phone_number = job_data.get("phone_number")
-            logger.info(f"Parsed from job metadata - agent_id: {agent_id}, phone_number: {phone_number}")
-        except json.JSONDecodeError as e:
-            logger.warning(f"Failed to parse job metadata: {e}")
+    # Job metadata set by the dispatching server takes precedence, since this
+    # worker is long-lived and serves calls for many agents
+    job_data = load_metadata(ctx.job.metadata, "job")
+    if job_data:
+        agent_id = job_data.get("agent_id")
+        phone_number = job_data.get("phone_number")
+        logger.info("Parsed from job metadata - agent_id: %s, phone_number: %s", agent_id, phone_number)
+    
+    # If not in job metadata, try the environment
+    if not agent_id:
+        agent_id = os.environ.get('LETTA_AGENT_ID')
+        logger.info("agent_id from env: %s", agent_id)
     
     # Fallback: try to get agent ID from room metadata
-    if not agent_id and ctx.room.metadata:
-        try:
-            room_data = json.loads(ctx.room.metadata) if isinstance(ctx.room.metadata, str) else ctx.room.metadata
+    if not agent_id:
+        room_data = load_metadata(ctx.room.metadata, "room")
+        if room_data:
             agent_id = room_data.get("agent_id")
-            logger.info(f"Got agent_id from room metadata: {agent_id}")
-        except Exception as e:
-            logger.warning(f"Failed to parse room metadata: {e}")
+            logger.info("Got agent_id from room metadata: %s", agent_id)
     
     # Final fallback: use a default agent ID
     if not agent_id:
         agent_id = os.environ.get('DEFAULT_LETTA_AGENT_ID', 'agent-1d9ed6b1-6b72-44b3-b3c8-8bb0b70f6a9e')
-        logger.warning(f"No agent ID found, using default: {agent_id}")
+        logger.warning("No agent ID found, using default: %s", agent_id)
     
-    logger.info(f"Final agent ID: {agent_id}")
-    logger.info(f"Room name: {ctx.room.name}")
-    logger.info(f"Room SID: {ctx.room.sid}")
+    logger.info("Final agent ID: %s", agent_id)
+    logger.info("Room name: %s", ctx.room.name)
+    logger.info("Room SID: %s", ctx.room.sid)
     
-    logger.info("Connecting to LiveKit room...")
-    await ctx.connect()
-    logger.info("Successfully connected to LiveKit room")
-
-    # If phone number provided, place outbound call
+    letta_base_url = 'http://localhost:8283/v1/voice-beta'
+    
+    # Outbound calls need a SIP trunk. Check before starting any background work.
+    sip_trunk_id = None
     if phone_number:
-        logger.info(f"Placing outbound call to {phone_number}")
-        sip_participant_identity = phone_number
-        
-        try:
-            # Get SIP trunk ID - you'll need to set this in environment
-            sip_trunk_id = os.environ.get('LIVEKIT_SIP_TRUNK_ID')
-            if not sip_trunk_id:
-                logger.error("LIVEKIT_SIP_TRUNK_ID required for outbound calls")
-                return
-                
-            await ctx.api.sip.create_sip_participant(api.CreateSIPParticipantRequest(
-                room_name=ctx.room.name,
-                sip_trunk_id=sip_trunk_id,
-                sip_call_to=phone_number,
-                participant_identity=sip_participant_identity,
-                wait_until_answered=True,
-            ))
-            
-            logger.info("Outbound call connected successfully")
-        except api.TwirpError as e:
-            logger.error(f"Error creating SIP participant: {e.message}, "
-                        f"SIP status: {e.metadata.get('sip_status_code')} "
-                        f"{e.metadata.get('sip_status')}")
+        # Get SIP trunk ID - you'll need to set this in environment
+        sip_trunk_id = os.environ.get('LIVEKIT_SIP_TRUNK_ID')
+        if not sip_trunk_id:
+            logger.error("LIVEKIT_SIP_TRUNK_ID required for outbound calls")
+            # End the job; returning alone leaves it assigned with nobody in the room
             ctx.shutdown()
             return
     
-    # Initialize voice assistant session
-    letta_base_url = 'http://localhost:8283/v1/voice-beta'
-    
-    # Add logging to debug
-    logger.info(f"Initializing session with Letta base URL: {letta_base_url}")
-    logger.info(f"Using Letta agent: {agent_id}")
-    
     # Initialize API keys
     deepgram_key = os.environ.get('DEEPGRAM_API_KEY') or os.environ.get('REACT_APP_DEEPGRAM_API_KEY')
     cartesia_key = os.environ.get('CARTESIA_API_KEY') or os.environ.get('REACT_APP_CARTESIA_API_KEY')
     
-    logger.info(f"Deepgram API key present: {bool(deepgram_key)}")
-    logger.info(f"Cartesia API key present: {bool(cartesia_key)}")
+    # The OpenAI key doubles as the Letta key unless LETTA_API_KEY is set
+    openai_key = os.environ.get('OPENAI_API_KEY') or os.environ.get('REACT_APP_OPENAI_API_KEY')
+    letta_key = os.environ.get('LETTA_API_KEY') or openai_key
     
-    # Test Letta connection first
-    logger.info(f"Testing Letta connection to {letta_base_url}...")
-    try:
-        import requests
-        response = requests.get(f"{letta_base_url}/v1/agents/{agent_id}", timeout=5)
-        logger.info(f"Letta agent test response: {response.status_code}")
-        if response.status_code == 200:
-            logger.info("✅ Letta agent is accessible")
-        else:
-            logger.warning(f"⚠️ Letta agent returned status {response.status_code}")
-    except Exception as e:
-        logger.error(f"❌ Cannot reach Letta: {e}")
+    logger.info("Deepgram API key present: %s", bool(deepgram_key))
+    logger.info("Cartesia API key present: %s", bool(cartesia_key))
+    logger.info("OpenAI API key present: %s", bool(openai_key))
+    logger.info("Letta API key present: %s", bool(letta_key))
+    
+    # Each job runs in its own process, so nothing built here outlives this call.
+    # STT/TTS are prebuilt by prewarm() before the job is assigned. If that failed,
+    # build them here, before any background work starts, so a bad key fails the
+    # job rather than raising while the outbound call is ringing.
+    stt = ctx.proc.userdata.get("stt")
+    tts = ctx.proc.userdata.get("tts")
+    if stt is None or tts is None:
+        stt, tts = build_stt_tts()
     
-    # Use Letta agent with the selected agent ID
-    logger.info("Creating AgentSession with:")
-    logger.info(f"  - LLM: Letta agent {agent_id}")
-    logger.info("  - STT: Deepgram")
-    logger.info("  - TTS: Cartesia")
+    # Open the Cartesia connection now, overlapping the room connect and SIP dial.
+    # Deepgram STT has no prewarm hook and is skipped.
+    prewarm_connections(stt, tts)
     
+    # Probe Letta while the LiveKit handshake is in flight. It only logs, so it runs
+    # in the background and never holds up the session or the greeting.
+    probe_task = asyncio.create_task(probe_letta(letta_base_url, agent_id))
+    _background_tasks.add(probe_task)
+    probe_task.add_done_callback(on_probe_done)
+    sip_task = None
     try:
-        logger.info("Attempting to create LLM with Letta...")
-        llm = openai.LLM.with_letta(
-            agent_id=agent_id,
-            base_url=letta_base_url
-        )
-        logger.info("✅ Letta LLM created successfully")
+        logger.info("Connecting to LiveKit room...")
+        await ctx.connect(auto_subscribe=AutoSubscribe.AUDIO_ONLY)
+        logger.info("Successfully connected to LiveKit room with audio subscription")
+
+        # If phone number provided, place outbound call. The dial runs in the background
+        # while the session is built and is awaited just before the session starts.
+        if phone_number:
+            logger.info("Placing outbound call to %s", phone_number)
+            sip_participant_identity = phone_number
+            sip_task = asyncio.create_task(ctx.api.sip.create_sip_participant(api.CreateSIPParticipantRequest(
+                room_name=ctx.room.name,
+                sip_trunk_id=sip_trunk_id,
+                sip_call_to=phone_number,
+                participant_identity=sip_participant_identity,
+                wait_until_answered=True,
+            )))
+    
+        # Initialize voice assistant session
+        # Add logging to debug
+        logger.info("Initializing session with Letta base URL: %s", letta_base_url)
+        logger.info("Using Letta agent: %s", agent_id)
+    
+        # Use Letta agent with the selected agent ID
+        logger.info("Creating AgentSession with:")
+        logger.info("  - LLM: Letta agent %s", agent_id)
+        logger.info("  - STT: Deepgram")
+        logger.info("  - TTS: Cartesia")
+    
+        try:
+            logger.info("Attempting to create LLM with Letta...")
+            llm = openai.LLM.with_letta(
+                agent_id=agent_id,
+                base_url=letta_base_url,
+                api_key=letta_key,
+            )
+            logger.info("✅ Letta LLM created successfully")
         
-        session = AgentSession(
-            llm=llm,
-            stt=deepgram.STT(api_key=deepgram_key) if deepgram_key else deepgram.STT(),
-            tts=cartesia.TTS(api_key=cartesia_key) if cartesia_key else cartesia.TTS(),
-        )
-        logger.info(f"✅ AgentSession created successfully with Letta agent: {agent_id}")
+            session = AgentSession(
+                llm=llm,
+                stt=stt,
+                tts=tts,
+            )
+            instructions = ""  # instructions are set in the Letta agent
+            logger.info("✅ AgentSession created successfully with Letta agent: %s", agent_id)
         
-    except Exception as e:
-        logger.error(f"❌ Failed to create AgentSession with Letta: {e}")
-        logger.error(f"Error type: {type(e).__name__}")
-        logger.error(f"Error details: {str(e)}")
-        logger.info("🔄 Falling back to regular OpenAI LLM...")
+        except Exception as e:
+            logger.error("❌ Failed to create AgentSession with Letta: %s", e)
+            logger.error("Error type: %s", type(e).__name__)
+            logger.error("Error details: %s", e)
+            logger.info("🔄 Falling back to regular OpenAI LLM...")
         
-        # Fallback to regular OpenAI if Letta fails
-        session = AgentSession(
-            llm=openai.LLM(model="gpt-4o-mini"),
-            stt=deepgram.STT(api_key=deepgram_key) if deepgram_key else deepgram.STT(),
-            tts=cartesia.TTS(api_key=cartesia_key) if cartesia_key else cartesia.TTS(),
-        )
-        logger.info("✅ Fallback AgentSession created with OpenAI")
+            # Fallback to regular OpenAI if Letta fails
+            session = AgentSession(
+                llm=openai.LLM(model="gpt-4o-mini", api_key=openai_key),
+                stt=stt,
+                tts=tts,
+            )
+            instructions = FALLBACK_SYSTEM_PROMPT
+            logger.info("✅ Fallback AgentSession created with OpenAI")
+    except BaseException:
+        # Don't leave the phone ringing into a room with no agent
+        for task in (sip_task, probe_task):
+            if task is not None:
+                task.cancel()
+        raise
 
-    logger.info("Connecting with auto_subscribe=AUDIO_ONLY...")
-    await ctx.connect(auto_subscribe=AutoSubscribe.AUDIO_ONLY)
-    logger.info("Connected with audio subscription")
+    # Log session events. Handlers are registered before the session starts so no
+    # events are missed.
+    @session.on("agent_started")
+    def on_agent_started(agent):
+        logger.info("Agent started event fired")
+    
+    @session.on("agent_stopped") 
+    def on_agent_stopped(reason):
+        logger.info("Agent stopped event fired: %s", reason)
+    
+    @session.on("track_published")
+    def on_track_published(track):
+        logger.info("Track published: %s - %s", track.kind, track.sid)
+    
+    # Wait for the outbound dial to be answered
+    if sip_task is not None:
+        try:
+            await sip_task
+        except api.TwirpError as e:
+            logger.error("Error creating SIP participant: %s, SIP status: %s %s",
+                         e.message,
+                         e.metadata.get('sip_status_code'),
+                         e.metadata.get('sip_status'))
+            ctx.shutdown()
+            return
+        logger.info("Outbound call connected successfully")
     
     logger.info("Starting agent session...")
     try:
         await session.start(
             room=ctx.room,
-            agent=Agent(instructions="You are a helpful AI assistant. Be concise and friendly."),
+            agent=Agent(instructions=instructions),
         )
         logger.info("Agent session started successfully")
     except Exception as e:
-        logger.error(f"Failed to start agent session: {e}")
+        logger.error("Failed to start agent session: %s", e)
         raise
 
-    # For inbound calls, greet the caller
-    # For outbound calls, greet the user when they answer
-    logger.info("Preparing to send greeting...")
-    if phone_number:
-        # This is an outbound call
-        greeting = "Hello! This is your AI assistant calling. I can hear you now. How can I help you today?"
-        logger.info(f"Sending outbound greeting: {greeting}")
-        try:
-            session.say(greeting)
-            logger.info(f"Outbound call greeting sent successfully to {phone_number}")
-        except Exception as e:
-            logger.error(f"Failed to send outbound greeting: {e}")
-    else:
-        # This is an inbound call
-        greeting = "Hello, thank you for calling. How can I assist you today?"
-        logger.info(f"Sending inbound greeting: {greeting}")
-        try:
-            session.say(greeting)
-            logger.info("Inbound call greeting sent successfully")
-        except Exception as e:
-            logger.error(f"Failed to send inbound greeting: {e}")
+    # Greet in the background; the speech pipeline plays it out while we return
+    greet_task = asyncio.create_task(greet(session, phone_number))
+    _background_tasks.add(greet_task)
+    greet_task.add_done_callback(on_greet_done)
     
     logger.info("Agent is now ready to handle conversation")
-    
-    # Log session events
-    @session.on("agent_started")
-    def on_agent_started(agent):
-        logger.info("Agent started event fired")
-    
-    @session.on("agent_stopped") 
-    def on_agent_stopped(reason):
-        logger.info(f"Agent stopped event fired: {reason}")
-    
-    @session.on("track_published")
-    def on_track_published(track):
-        logger.info(f"Track published: {track.kind} - {track.sid}")
 
 if __name__ == "__main__":
+    configure_logging()
+    
     # Print to ensure script is starting
     print(f"LIVEKIT AGENT STARTING AT {datetime.now().isoformat()}", flush=True)
     print(f"Log file: {log_filename}", flush=True)
     
-    logger.info("="*80)
+    logger.info(_SEP80)
     logger.info("LIVEKIT AGENT STARTUP")
-    logger.info("="*80)
+    logger.info(_SEP80)
     logger.info("Starting telephony agent application...")
-    logger.info(f"Python version: {sys.version}")
-    logger.info(f"Python executable: {sys.executable}")
-    logger.info(f"LiveKit agents version: {agents.__version__ if hasattr(agents, '__version__') else 'unknown'}")
-    logger.info(f"Command line args: {sys.argv}")
-    
-    # Log all environment variables
-    logger.info("Environment variables:")
-    for key, value in sorted(os.environ.items()):
-        if any(sensitive in key.upper() for sensitive in ['KEY', 'SECRET', 'PASSWORD', 'TOKEN']):
-            logger.info(f"  {key}: {'*' * 8}{value[-4:] if value else 'None'}")
-        else:
-            logger.info(f"  {key}: {value}")
+    logger.info("Python version: %s", sys.version)
+    logger.info("Python executable: %s", sys.executable)
+    logger.info("LiveKit agents version: %s", getattr(agents, '__version__', 'unknown'))
+    logger.info("Command line args: %s", sys.argv)
+    
+    log_environment()
+    
+    if uvloop is not None:
+        logger.info("Using uvloop event loop")
+    
+    # Synthesize the fixed greetings once here; job processes load them from disk.
+    # Only the commands that run a worker need them, not e.g. 'download-files'.
+    if len(sys.argv) > 1 and sys.argv[1] in ('start', 'dev'):
+        synthesize_greetings()
     
     # Run with CLI commands (like "start", "dev", etc.)
     try:
         logger.info("About to start agents.cli.run_app...")
         agents.cli.run_app(agents.WorkerOptions(
             entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
             agent_name="telephony-agent"
         ))
     except Exception as e:
-        logger.error(f"Failed to start agent: {e}", exc_info=True)
+        logger.error("Failed to start agent: %s", e, exc_info=True)
         print(f"ERROR: Failed to start agent: {e}", flush=True)
         sys.exit(1)
\ No newline at end of file
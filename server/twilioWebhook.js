@@ -1,8 +1,5 @@
 const express = require('express');
-const { AccessToken, RoomServiceClient } = require('livekit-server-sdk');
-const { spawn } = require('child_process');
-const path = require('path');
-const fs = require('fs');
+const { AccessToken, AgentDispatchClient, RoomServiceClient } = require('livekit-server-sdk');
 const cors = require('cors');
 // Load environment variables from parent directory and current directory
 require('dotenv').config({ path: '../.env' });
@@ -23,8 +20,12 @@ console.log('API Key:', LIVEKIT_API_KEY);
 console.log('Secret length:', LIVEKIT_API_SECRET?.length);
 console.log('WS URL:', LIVEKIT_WS_URL);
 
-// Initialize LiveKit Room Service Client
+// Name the livekit-agent.py worker registers under
+const AGENT_NAME = 'telephony-agent';
+
+// Initialize LiveKit Room Service and Agent Dispatch Clients
 const roomService = new RoomServiceClient(LIVEKIT_WS_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET);
+const agentDispatchClient = new AgentDispatchClient(LIVEKIT_WS_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET);
 
 // Generate LiveKit token for telephony
 async function generateLiveKitToken(roomName, participantName, phoneNumber) {
@@ -127,162 +128,29 @@ app.post('/api/make-call', async (req, res) => {
     });
 
 
-    // First, start the Letta agent for this specific call
-    const agentScript = path.join(__dirname, '../livekit-agent.py');
-    
-    console.log(`🤖 Starting agent for agent ID: ${agentId}`);
-    console.log(`📍 Agent script path: ${agentScript}`);
-    console.log(`🏠 Room name: ${roomName}`);
-    console.log(`🔑 Environment variables:`);
-    console.log(`   - LIVEKIT_URL: ${LIVEKIT_WS_URL}`);
-    console.log(`   - LIVEKIT_API_KEY: ${LIVEKIT_API_KEY}`);
-    console.log(`   - LETTA_AGENT_ID: ${agentId}`);
-    
-    // Create logs directory and file for agent output
-    const logsDir = path.join(__dirname, 'logs');
-    if (!fs.existsSync(logsDir)) {
-      fs.mkdirSync(logsDir, { recursive: true });
-    }
-    
-    const timestamp = new Date().toISOString().replace(/:/g, '-').slice(0, -5);
-    const agentLogFile = path.join(logsDir, `agent-${roomName}-${timestamp}.log`);
-    const agentLogStream = fs.createWriteStream(agentLogFile, { flags: 'a' });
-    
-    console.log(`📝 Agent log file: ${agentLogFile}`);
-    agentLogStream.write(`=== Agent Process Starting ===\n`);
-    agentLogStream.write(`Timestamp: ${new Date().toISOString()}\n`);
-    agentLogStream.write(`Room: ${roomName}\n`);
-    agentLogStream.write(`Agent ID: ${agentId}\n`);
-    agentLogStream.write(`Command: conda run -n letta python ${agentScript} connect --room ${roomName}\n\n`);
-    
-    // Get OpenAI API key to use as Letta API key
-    const openaiApiKey = process.env.OPENAI_API_KEY || process.env.REACT_APP_OPENAI_API_KEY || '';
-    
-    if (!openaiApiKey) {
-      console.log('⚠️  WARNING: No OpenAI API key found. Letta integration will fail!');
-      console.log('   Set OPENAI_API_KEY or REACT_APP_OPENAI_API_KEY in your .env file');
-    }
-    
-    const agentProcess = spawn('conda', ['run', '-n', 'letta', 'python', agentScript, 'connect', '--room', roomName], {
-      stdio: ['pipe', 'pipe', 'pipe'],
-      env: {
-        ...process.env,
-        LIVEKIT_URL: LIVEKIT_WS_URL,
-        LIVEKIT_API_KEY: LIVEKIT_API_KEY,
-        LIVEKIT_API_SECRET: LIVEKIT_API_SECRET,
-        LIVEKIT_SIP_TRUNK_ID: 'ST_LgQdMYv7NnfA',
-        LETTA_AGENT_ID: agentId,  // Pass the agent ID directly
-        LETTA_API_KEY: openaiApiKey,  // Use OpenAI API key as Letta API key
-        OPENAI_API_KEY: openaiApiKey,  // Also pass it as OpenAI API key
-        PYTHONUNBUFFERED: '1',  // Force Python to flush output immediately
-        LIVEKIT_LOG_LEVEL: 'debug'  // Enable debug logging
-      }
-    });
-
-    let agentOutput = '';
-    let agentError = '';
-
-    agentProcess.stdout.on('data', (data) => {
-      const text = data.toString();
-      agentOutput += text;
-      agentLogStream.write(`[STDOUT] ${text}`);
-      
-      const lines = text.split('\n').filter(line => line.trim());
-      lines.forEach(line => {
-        console.log(`🤖 [AGENT STDOUT]: ${line}`);
-      });
-    });
-
-    agentProcess.stderr.on('data', (data) => {
-      const text = data.toString();
-      agentError += text;
-      agentLogStream.write(`[STDERR] ${text}`);
-      
-      const lines = text.split('\n').filter(line => line.trim());
-      lines.forEach(line => {
-        console.log(`🤖 [AGENT STDERR]: ${line}`);
-      });
+    // Dispatch the long-running telephony agent worker to the room. The worker reads
+    // agent_id and phone_number from the job metadata and places the SIP call itself.
+    const dispatch = await agentDispatchClient.createDispatch(roomName, AGENT_NAME, {
+      metadata: JSON.stringify({
+        agent_id: agentId,
+        phone_number: phoneNumber
+      })
     });
 
-    agentProcess.on('error', (error) => {
-      const errorMsg = `Failed to start agent process: ${error.message}`;
-      console.error(errorMsg);
-      agentLogStream.write(`[ERROR] ${errorMsg}\n`);
-      agentLogStream.write(`[ERROR] Stack trace: ${error.stack}\n`);
-    });
+    console.log(`🤖 Dispatched ${AGENT_NAME} for agent ID: ${agentId}`);
+    console.log(`📞 Agent will call: ${phoneNumber}`);
+    console.log(`🔗 Room: ${roomName}, dispatch: ${dispatch.id}`);
+    // 'dispatched' only means the job was queued. The worker may still fail to place
+    // the call (e.g. LIVEKIT_SIP_TRUNK_ID missing in its environment); that failure is
+    // only visible in the worker's logs.
+    console.log(`ℹ️  Dispatch queued; check the livekit-agent.py worker logs for call status`);
 
-    agentProcess.on('close', (code) => {
-      console.log(`🤖 [AGENT EXIT]: Process exited with code ${code}`);
-      agentLogStream.write(`\n=== Agent Process Exited ===\n`);
-      agentLogStream.write(`Exit code: ${code}\n`);
-      agentLogStream.write(`Timestamp: ${new Date().toISOString()}\n`);
-      
-      if (code !== 0) {
-        console.log(`❌ Agent failed with exit code ${code}`);
-        console.log(`📄 Check full logs at: ${agentLogFile}`);
-        
-        if (agentOutput) {
-          console.log(`📄 Full agent output:\n${agentOutput}`);
-        }
-        if (agentError) {
-          console.log(`❌ Full agent error:\n${agentError}`);
-        }
-      }
+    res.json({
+      roomName,
+      status: 'dispatched',
+      phoneNumber: phoneNumber,
+      agentId: agentId
     });
-
-    // Wait a moment for agent to start, then create SIP participant
-    setTimeout(() => {
-      console.log(`📞 Creating SIP call to ${phoneNumber}`);
-      const dispatchProcess = spawn('lk', [
-        'sip', 'participant', 'create',
-        '--room', roomName,
-        '--trunk', 'ST_LgQdMYv7NnfA',
-        '--call', phoneNumber,
-        '--identity', `sip-${Date.now()}`
-      ], {
-        stdio: ['pipe', 'pipe', 'pipe'],
-        env: {
-          ...process.env,
-          LIVEKIT_URL: LIVEKIT_WS_URL,
-          LIVEKIT_API_KEY: LIVEKIT_API_KEY,
-          LIVEKIT_API_SECRET: LIVEKIT_API_SECRET
-        }
-      });
-
-      let output = '';
-      let error = '';
-
-      dispatchProcess.stdout.on('data', (data) => {
-        output += data.toString();
-      });
-
-      dispatchProcess.stderr.on('data', (data) => {
-        error += data.toString();
-      });
-
-      dispatchProcess.on('close', (code) => {
-        if (code === 0) {
-          console.log(`✅ Outbound call created to: ${phoneNumber}`);
-          console.log(`📞 SIP participant created successfully`);
-          console.log(`🔗 Room: ${roomName}`);
-          res.json({
-            roomName,
-            status: 'dispatched',
-            phoneNumber: phoneNumber,
-            agentId: agentId
-          });
-        } else {
-          console.error(`❌ SIP call failed with code ${code}`);
-          console.error(`📝 SIP Error output: ${error}`);
-          console.error(`📝 SIP Standard output: ${output}`);
-          agentProcess.kill(); // Kill the agent if SIP call fails
-          res.status(500).json({ error: `SIP call failed: ${error || 'Unknown error'}` });
-        }
-      });
-    }, 2000); // Wait 2 seconds for agent to initialize
-
-
-
   } catch (error) {
     console.error('Error making call:', error);
     res.status(500).json({ error: 'Failed to make call' });
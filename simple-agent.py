@@ -2,6 +2,7 @@
 
 import os
 import json
+import asyncio
 import logging
 from dotenv import load_dotenv
 
@@ -11,12 +12,22 @@ from livekit.agents import AgentSession, Agent, AutoSubscribe
 # Just for testing - use a simple TTS
 from livekit.plugins import openai, cartesia, deepgram
 
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
+# Use libuv's event loop if available. This runs at import time so LiveKit's job
+# processes, which import this script as __mp_main__, get it too.
+if uvloop is not None:
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
 load_dotenv()
 
 logger = logging.getLogger("simple-agent")
 
 async def entrypoint(ctx: agents.JobContext):
-    logger.info(f"Agent joining room: {ctx.room.name}")
+    logger.info("Agent joining room: %s", ctx.room.name)
     
     await ctx.connect()
     
@@ -34,7 +45,7 @@ async def entrypoint(ctx: agents.JobContext):
 
     # Always greet when joining
     session.say("Hello! I'm your AI assistant. I can hear you now. How can I help you?")
-    logger.info(f"Agent greeted caller in room {ctx.room.name}")
+    logger.info("Agent greeted caller in room %s", ctx.room.name)
 
 if __name__ == "__main__":
     # Run as a persistent worker
@@ -20,6 +20,13 @@ else
     echo "Warning: .env.agent file not found"
 fi
 
+# The long-lived worker needs these for every call it handles
+for var in LIVEKIT_SIP_TRUNK_ID OPENAI_API_KEY; do
+    if [ -z "${!var}" ]; then
+        echo "Warning: $var is not set (add it to .env.agent)"
+    fi
+done
+
 # Run the LiveKit agent
 echo "Starting LiveKit agent..."
-python livekit-agent.py
\ No newline at end of file
+python livekit-agent.py start
\ No newline at end of file